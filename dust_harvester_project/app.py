@@ -1,59 +1,53 @@
 from flask import Flask, render_template, request, jsonify, redirect, url_for
-import asyncio
 import os
 import threading
 import time
 from datetime import datetime
-from src.main import run
 from src.config import settings
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
 
-# Global state for harvester
-harvester_running = False
-harvester_thread = None
-last_run_time = None
-candidates_found = 0
-transactions_sent = 0
+# Harvester state lives in HarvesterDaemon: in-process in "thread" mode,
+# in a separate process (python -m src.daemon) in "process" mode
+local_harvester = None
+local_harvester_lock = threading.Lock()
 
-def run_harvester_async():
-    """Run the harvester in a separate thread"""
-    global harvester_running, last_run_time, candidates_found, transactions_sent
+def harvester_command(command):
+    """Send a command (status/start/stop) to the harvester and return its reply"""
+    global local_harvester
     
-    harvester_running = True
-    last_run_time = datetime.now()
+    if settings.HARVESTER_MODE == 'process':
+        from src.ipc import send_command
+        return send_command(settings.HARVESTER_SOCKET, command)
     
-    try:
-        # Run the async harvester
-        result = asyncio.run(run())
-        if result:
-            global transactions_sent
-            transactions_sent += result
-        harvester_running = False
-    except Exception as e:
-        print(f"Harvester error: {e}")
-        harvester_running = False
+    with local_harvester_lock:
+        if local_harvester is None:
+            from src.daemon import HarvesterDaemon
+            local_harvester = HarvesterDaemon()
+    return local_harvester.handle(command)
 
-@app.route('/')
-def index():
-    """Main dashboard page"""
-    global harvester_running, last_run_time, candidates_found, transactions_sent
-    
-    # Check if candidates.txt exists and count lines
-    candidates_count = 0
+def count_candidates():
+    """Count lines in candidates.txt"""
     if os.path.exists('candidates.txt'):
         try:
             with open('candidates.txt', 'r') as f:
-                candidates_count = len(f.readlines())
+                return len(f.readlines())
         except:
-            candidates_count = 0
+            return 0
+    return 0
+
+@app.route('/')
+def index():
+    """Main dashboard page"""
+    state = harvester_command('status')
+    last_run = state.get('last_run')
     
     return render_template('index.html', 
-                         harvester_running=harvester_running,
-                         last_run_time=last_run_time,
-                         candidates_found=candidates_count,
-                         transactions_sent=transactions_sent,
+                         harvester_running=state.get('running', False),
+                         last_run_time=datetime.fromisoformat(last_run) if last_run else None,
+                         candidates_found=count_candidates(),
+                         transactions_sent=state.get('transactions_sent', 0),
                          dry_run=settings.DRY_RUN,
                          settings=settings)
 
@@ -65,42 +59,23 @@ def config():
 @app.route('/start_harvester', methods=['POST'])
 def start_harvester():
     """Start the harvester"""
-    global harvester_running, harvester_thread
-    
-    if not harvester_running:
-        harvester_thread = threading.Thread(target=run_harvester_async)
-        harvester_thread.daemon = True
-        harvester_thread.start()
-        return jsonify({'status': 'started'})
-    else:
-        return jsonify({'status': 'already_running'})
+    return jsonify(harvester_command('start'))
 
 @app.route('/stop_harvester', methods=['POST'])
 def stop_harvester():
     """Stop the harvester"""
-    global harvester_running
-    harvester_running = False
-    return jsonify({'status': 'stopped'})
+    return jsonify(harvester_command('stop'))
 
 @app.route('/status')
 def status():
     """Get harvester status"""
-    global harvester_running, last_run_time, candidates_found, transactions_sent
-    
-    # Check candidates count
-    candidates_count = 0
-    if os.path.exists('candidates.txt'):
-        try:
-            with open('candidates.txt', 'r') as f:
-                candidates_count = len(f.readlines())
-        except:
-            candidates_count = 0
+    state = harvester_command('status')
     
     return jsonify({
-        'running': harvester_running,
-        'last_run': last_run_time.isoformat() if last_run_time else None,
-        'candidates_found': candidates_count,
-        'transactions_sent': transactions_sent,
+        'running': state.get('running', False),
+        'last_run': state.get('last_run'),
+        'candidates_found': count_candidates(),
+        'transactions_sent': state.get('transactions_sent', 0),
         'dry_run': settings.DRY_RUN
     })
 
@@ -0,0 +1 @@
+# Корневой conftest: делает пакет src импортируемым из tests/
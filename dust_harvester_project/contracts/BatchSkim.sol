@@ -0,0 +1,40 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.19;
+
+interface IUniswapV2Pair {
+    function skim(address to) external;
+}
+
+/// @notice Вызывает skim() у нескольких пар в одной транзакции.
+/// Каждый вызов обёрнут в try/catch: revert одной пары не откатывает весь пакет.
+/// Адреса без кода пропускаются заранее: проверку extcodesize на стороне
+/// вызывающего try/catch не перехватывает.
+contract BatchSkim {
+    address public immutable owner;
+
+    event SkimFailed(address indexed pair);
+
+    constructor() {
+        owner = msg.sender;
+    }
+
+    /// @param pairs адреса пар для skim
+    /// @param to получатель излишков
+    /// @return succeeded количество успешных skim
+    function batchSkim(address[] calldata pairs, address to) external returns (uint256 succeeded) {
+        require(msg.sender == owner, "BatchSkim: not owner");
+
+        for (uint256 i = 0; i < pairs.length; i++) {
+            if (pairs[i].code.length == 0) {
+                emit SkimFailed(pairs[i]);
+                continue;
+            }
+
+            try IUniswapV2Pair(pairs[i]).skim(to) {
+                succeeded++;
+            } catch {
+                emit SkimFailed(pairs[i]);
+            }
+        }
+    }
+}
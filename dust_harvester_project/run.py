@@ -3,8 +3,24 @@
 Простой скрипт для запуска Dust Harvester
 """
 import os
+import subprocess
 import sys
 
+def serve_production():
+    """harvester в отдельном процессе, веб-слой — N воркеров gunicorn"""
+    env = os.environ.copy()
+    env["HARVESTER_MODE"] = "process"
+    workers = env.get("WEB_WORKERS", "4")
+    
+    daemon = subprocess.Popen([sys.executable, "-m", "src.daemon"], env=env)
+    print(f"⚙️  Harvester запущен в отдельном процессе (pid {daemon.pid})")
+    print(f"🌐 Запуск веб-интерфейса ({workers} воркеров) на http://localhost:5000")
+    try:
+        subprocess.call(["gunicorn", "-w", workers, "-b", "0.0.0.0:5000", "main:app"], env=env)
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
 def main():
     print("🚀 Запуск Onchain Dust Harvester...")
     
@@ -14,6 +30,10 @@ def main():
         print("📋 Создайте файл .env с настройками (см. README_SETUP.md)")
         sys.exit(1)
     
+    if "--production" in sys.argv:
+        serve_production()
+        return
+    
     # Запускаем веб-приложение
     from app import app
     print("🌐 Запуск веб-интерфейса на http://localhost:5000")
@@ -1,4 +1,5 @@
 import os
+import threading
 from dataclasses import dataclass
 
 @dataclass
@@ -18,10 +19,29 @@ class Settings:
     GAS_PRICE_GWEI: int = int(os.getenv("GAS_PRICE_GWEI", "3"))  # Намного дешевле на BSC!
     GAS_MULTIPLIER: float = float(os.getenv("GAS_MULTIPLIER", "1.2"))
     
+    # Глубина отслеживаемой цепочки блоков для обнаружения реорганизаций
+    REORG_DEPTH: int = int(os.getenv("REORG_DEPTH", "12"))
+    
+    # Планировщик исполнения: лимит транзакций на блок и срок жизни кандидата
+    MAX_TX_PER_BLOCK: int = int(os.getenv("MAX_TX_PER_BLOCK", "5"))
+    CANDIDATE_DEADLINE_BLOCKS: int = int(os.getenv("CANDIDATE_DEADLINE_BLOCKS", "2"))
+    BLOCK_TIME_SECONDS: float = float(os.getenv("BLOCK_TIME_SECONDS", "3"))  # BSC
+    
+    # Пакетный режим: несколько skim в одной транзакции через контракт BatchSkim
+    BATCH_MODE: bool = os.getenv("BATCH_MODE", "false").lower() == "true"
+    BATCH_EXECUTOR: str = os.getenv("BATCH_EXECUTOR", "")
+    BATCH_GAS_BUDGET: int = int(os.getenv("BATCH_GAS_BUDGET", "3000000"))
+    BATCH_BASE_GAS: int = int(os.getenv("BATCH_BASE_GAS", "40000"))  # 21000 + вызов контракта
+    SKIM_GAS_PER_PAIR: int = int(os.getenv("SKIM_GAS_PER_PAIR", "60000"))
+    
     # Адреса контрактов PancakeSwap на BSC
     UNISWAP_V2_FACTORY: str = os.getenv("UNISWAP_V2_FACTORY", "0xcA143Ce32Fe78f1f7019d7d551a6402fC5350c73")
     UNISWAP_V2_ROUTER: str = os.getenv("UNISWAP_V2_ROUTER", "0x10ED43C718714eb63d5aA57B78B54704E256024E")
     
+    # Режим harvester: "thread" — внутри веб-процесса, "process" — отдельный процесс (src.daemon)
+    HARVESTER_MODE: str = os.getenv("HARVESTER_MODE", "thread")
+    HARVESTER_SOCKET: str = os.getenv("HARVESTER_SOCKET", "/tmp/dust_harvester.sock")
+    
     # Настройки логирования
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
@@ -32,6 +52,36 @@ class Settings:
         
         if self.MIN_PROFIT_ETH <= 0:
             raise ValueError("MIN_PROFIT_ETH должен быть больше 0")
+        
+        if self.MAX_TX_PER_BLOCK <= 0:
+            raise ValueError("MAX_TX_PER_BLOCK должен быть больше 0")
+        
+        if self.HARVESTER_MODE not in ("thread", "process"):
+            raise ValueError("HARVESTER_MODE должен быть 'thread' или 'process'")
+        
+        if self.BATCH_MODE and not self.BATCH_EXECUTOR and not self.DRY_RUN:
+            raise ValueError("BATCH_EXECUTOR требуется для пакетного режима в LIVE")
+        
+        if self.BATCH_MODE and self.BATCH_GAS_BUDGET <= self.BATCH_BASE_GAS:
+            raise ValueError("BATCH_GAS_BUDGET должен быть больше BATCH_BASE_GAS")
+
+class LazySettings:
+    """Создает и валидирует Settings при первом обращении к атрибуту"""
+    
+    def __init__(self):
+        self._settings = None
+        self._lock = threading.Lock()
+    
+    def get(self) -> Settings:
+        """Получить (и при необходимости создать) настройки"""
+        if self._settings is None:
+            with self._lock:
+                if self._settings is None:
+                    self._settings = Settings()
+        return self._settings
+    
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
 
-# Глобальный экземпляр настроек
-settings = Settings()
+# Глобальный экземпляр настроек (создается лениво)
+settings = LazySettings()
@@ -0,0 +1,98 @@
+import asyncio
+import signal
+import threading
+from datetime import datetime
+from typing import Any, Dict
+from src.config import settings
+from src.ipc import StateServer
+import logging
+
+logger = logging.getLogger(__name__)
+
+class HarvesterDaemon:
+    """
+    Процесс harvester, отделенный от веб-слоя
+
+    Запускает проходы harvester по команде и публикует состояние
+    через Unix-сокет; веб-воркеры только читают его.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_run_time = None
+        self.transactions_sent = 0
+
+    def handle(self, command: str) -> Dict[str, Any]:
+        """Обработать команду IPC"""
+        if command == 'start':
+            return {'status': 'started' if self.start() else 'already_running'}
+        if command == 'stop':
+            # Проход завершится на ближайшей проверке; running остается True до выхода потока
+            self._stop.set()
+            return {'status': 'stopped'}
+        return self.snapshot()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Согласованный снимок состояния"""
+        with self._lock:
+            return {
+                'running': self.running,
+                'stopping': self.running and self._stop.is_set(),
+                'last_run': self.last_run_time.isoformat() if self.last_run_time else None,
+                'transactions_sent': self.transactions_sent,
+            }
+
+    def start(self) -> bool:
+        """Запустить проход harvester, если он еще не идет"""
+        with self._lock:
+            # Пока предыдущий проход не завершился, второй не запускаем
+            if self.running:
+                return False
+            self._stop.clear()
+            self.last_run_time = datetime.now()
+            self._thread = threading.Thread(target=self._run_once, daemon=True)
+            self._thread.start()
+        return True
+
+    def _run_once(self):
+        from src.main import run
+
+        try:
+            result = asyncio.run(run(self._stop))
+            with self._lock:
+                if result:
+                    self.transactions_sent += result
+        except Exception as e:
+            logger.error(f"Harvester error: {e}")
+
+def main():
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
+    daemon = HarvesterDaemon()
+    try:
+        server = StateServer(settings.HARVESTER_SOCKET, daemon.handle)
+    except RuntimeError as e:
+        logger.error(str(e))
+        raise SystemExit(1)
+
+    def shutdown(signum, frame):
+        # shutdown() блокируется до выхода из serve_forever, поэтому из другого потока
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, shutdown)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
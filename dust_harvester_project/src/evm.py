@@ -1,6 +1,4 @@
-import asyncio
-from web3 import Web3
-from eth_account import Account
+import threading
 from src.config import settings
 import logging
 
@@ -8,6 +6,10 @@ logger = logging.getLogger(__name__)
 
 class EVMConnection:
     def __init__(self):
+        # Тяжелые импорты откладываются до первого подключения
+        from web3 import Web3
+        from eth_account import Account
+        
         self.w3 = Web3(Web3.HTTPProvider(settings.RPC_URL))
         self.account = None
         
@@ -22,6 +24,14 @@ class EVMConnection:
             logger.error(f"Error getting latest block: {e}")
             return None
     
+    async def get_block(self, block_identifier):
+        """Получить блок по номеру или хэшу"""
+        try:
+            return self.w3.eth.get_block(block_identifier)
+        except Exception as e:
+            logger.error(f"Error getting block {block_identifier}: {e}")
+            return None
+    
     async def get_balance(self, address):
         """Получить баланс адреса"""
         try:
@@ -73,5 +83,23 @@ class EVMConnection:
             logger.error(f"Error calling contract {contract_address}: {e}")
             return None
 
-# Глобальный экземпляр подключения
-evm = EVMConnection()
+class LazyEVMConnection:
+    """Создает EVMConnection при первом обращении к атрибуту"""
+    
+    def __init__(self):
+        self._connection = None
+        self._lock = threading.Lock()
+    
+    def get(self) -> EVMConnection:
+        """Получить (и при необходимости создать) подключение"""
+        if self._connection is None:
+            with self._lock:
+                if self._connection is None:
+                    self._connection = EVMConnection()
+        return self._connection
+    
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+# Глобальный экземпляр подключения (создается лениво)
+evm = LazyEVMConnection()
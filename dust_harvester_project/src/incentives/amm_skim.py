@@ -1,21 +1,30 @@
 import asyncio
-from typing import List, Tuple
+import time
+from typing import Dict, List, Tuple
 import random
 from src.incentives.base import BaseIncentiveStrategy
 from src.config import settings
 from src.evm import evm
 from src.utils.metrics import metrics
+from src.utils.blocks import chain, PAIR_STATE, SIMULATION, SENT_SKIM
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Пауза между проверками пар (секунды)
+PAIR_CHECK_DELAY_SECONDS = 0.1
+
 class AmmSkim(BaseIncentiveStrategy):
     """
     Стратегия поиска surplus токенов в AMM парах для skim операций
     """
     
-    def __init__(self):
+    def __init__(self, stop_event=None):
         super().__init__()
+        # threading.Event для остановки прохода извне (см. src.daemon)
+        self.stop_event = stop_event
+        # Блок, на котором была проверена пара кандидата: pair_address -> номер блока
+        self.candidate_blocks: Dict[str, int] = {}
         self.uniswap_factory = settings.UNISWAP_V2_FACTORY
         self.pairs_checked = set()
     
@@ -27,6 +36,7 @@ class AmmSkim(BaseIncentiveStrategy):
         metrics.start_session()
         
         candidates = []
+        last_sync = time.monotonic()
         
         try:
             # Получаем список пар для проверки
@@ -39,16 +49,27 @@ class AmmSkim(BaseIncentiveStrategy):
                 if i >= settings.MAX_PAIRS:
                     break
                 
+                if self.stop_event and self.stop_event.is_set():
+                    logger.info("Discovery stopped by request")
+                    break
+                
+                # Обход пар длится несколько блоков — держим голову цепочки актуальной
+                if time.monotonic() - last_sync >= settings.BLOCK_TIME_SECONDS:
+                    await chain.sync()
+                    last_sync = time.monotonic()
+                
                 try:
                     candidate = await self._check_pair_for_surplus(pair_address)
                     if candidate:
                         candidates.append(candidate)
+                        if chain.head:
+                            self.candidate_blocks[pair_address] = chain.head[0]
                         logger.info(f"Found candidate in pair {pair_address}: surplus {candidate[2]}")
                     
                     metrics.record_pair_checked(pair_address)
                     
                     # Небольшая задержка между проверками
-                    await asyncio.sleep(0.1)
+                    await asyncio.sleep(PAIR_CHECK_DELAY_SECONDS)
                     
                 except Exception as e:
                     logger.error(f"Error checking pair {pair_address}: {e}")
@@ -86,6 +107,7 @@ class AmmSkim(BaseIncentiveStrategy):
             
             if result and result.get('hash'):
                 logger.info(f"Skim transaction sent: {result['hash']}")
+                chain.put(SENT_SKIM, pair_address, result['hash'])
                 
                 # Записываем метрики
                 gas_cost_eth = (transaction_data.get('gasPrice', 0) * transaction_data.get('gas', 0)) / 10**18
@@ -101,6 +123,66 @@ class AmmSkim(BaseIncentiveStrategy):
             metrics.record_error(f"Execution error for {pair_address}: {e}", "execution")
             return False
     
+    async def resimulate_candidate(self, pair_address: str) -> Tuple[str, str, float] | None:
+        """
+        Повторно проверить пару на текущем блоке (для устаревших кандидатов)
+        """
+        return await self._check_pair_for_surplus(pair_address)
+    
+    async def execute_batch(self, candidates: List[Tuple[str, str, float]]) -> int:
+        """
+        Выполнить skim для группы кандидатов одной транзакцией через BatchSkim
+        
+        Returns:
+            int: Количество пар, включенных в отправленный пакет
+        """
+        valid = [c for c in candidates if await self.validate_candidate(c)]
+        if not valid:
+            return 0
+        
+        try:
+            from src.utils.gas import optimize_gas_price
+            from src.utils.batch import select_batch, batch_gas_limit, batch_net_profit_wei
+            gas_price = await optimize_gas_price()
+            
+            selected = select_batch(valid, gas_price)
+            if not selected:
+                logger.info("No candidates fit into the batch")
+                return 0
+            
+            net_profit = batch_net_profit_wei(selected, gas_price)
+            if net_profit <= settings.MIN_PROFIT_ETH * 10**18:
+                logger.info(f"Batch not profitable: {len(selected)} pairs, profit: {net_profit/10**18:.6f} ETH")
+                return 0
+            
+            transaction_data = await self._create_batch_transaction(selected, gas_price, batch_gas_limit(selected))
+            if not transaction_data:
+                logger.error("Failed to create batch transaction")
+                return 0
+            
+            result = await evm.send_transaction(transaction_data)
+            
+            if result and result.get('hash'):
+                logger.info(f"Batch skim transaction sent: {result['hash']}, pairs: {len(selected)}, "
+                            f"expected profit: {net_profit/10**18:.6f} ETH")
+                for pair_address, _, _ in selected:
+                    chain.put(SENT_SKIM, pair_address, result['hash'])
+                
+                # Делим газ пакета поровну между парами
+                gas_cost_eth = (transaction_data['gasPrice'] * transaction_data['gas']) / 10**18
+                for _, _, surplus in selected:
+                    metrics.record_candidate_executed(surplus, gas_cost_eth / len(selected))
+                
+                return len(selected)
+            else:
+                logger.error("Failed to send batch skim transaction")
+                return 0
+                
+        except Exception as e:
+            logger.error(f"Error executing batch of {len(valid)} candidates: {e}")
+            metrics.record_error(f"Batch execution error: {e}", "execution")
+            return 0
+    
     async def _get_pairs_to_check(self) -> List[str]:
         """
         Получить список адресов пар для проверки
@@ -126,8 +208,12 @@ class AmmSkim(BaseIncentiveStrategy):
     
     async def _check_pair_for_surplus(self, pair_address: str) -> Tuple[str, str, float] | None:
         """
-        Проверить пару на наличие surplus токенов
+        Проверить пару на наличие surplus токенов (результат кэшируется на блок)
         """
+        cached = chain.get_recent(SIMULATION, pair_address)
+        if cached is not None:
+            return cached or None
+        
         try:
             # Эмуляция проверки surplus в паре
             # В реальности здесь будет вызов getReserves и проверка баланса контракта
@@ -140,8 +226,12 @@ class AmmSkim(BaseIncentiveStrategy):
                 token_address = f"0x{''.join([f'{random.randint(0, 15):x}' for _ in range(40)])}"
                 surplus_amount = random.uniform(0.001, 0.1)  # От 0.001 до 0.1 ETH
                 
-                return (pair_address, token_address, surplus_amount)
+                candidate = (pair_address, token_address, surplus_amount)
+                chain.put(SIMULATION, pair_address, candidate)
+                return candidate
             
+            # Пустой кортеж — закэшированное "surplus нет"
+            chain.put(SIMULATION, pair_address, ())
             return None
             
         except Exception as e:
@@ -174,6 +264,49 @@ class AmmSkim(BaseIncentiveStrategy):
             logger.error(f"Error creating skim transaction for {pair_address}: {e}")
             return None
     
+    async def _create_batch_transaction(self, candidates: List[Tuple[str, str, float]],
+                                        gas_price: int, gas_limit: int) -> dict | None:
+        """
+        Создать транзакцию batchSkim для контракта-исполнителя
+        """
+        try:
+            # В DRY RUN ключ может отсутствовать — тогда получатель нулевой
+            sender = evm.account.address if evm.account else "0x" + "0" * 40
+            
+            transaction_data = {
+                'from': sender,
+                'to': settings.BATCH_EXECUTOR,
+                'value': 0,
+                'gas': gas_limit,
+                'gasPrice': gas_price,
+                'data': self._encode_batch_skim_call([c[0] for c in candidates], sender),
+                'chainId': settings.CHAIN_ID
+            }
+            
+            return transaction_data
+            
+        except Exception as e:
+            logger.error(f"Error creating batch transaction: {e}")
+            return None
+    
+    def _encode_batch_skim_call(self, pair_addresses: List[str], recipient: str) -> str:
+        """
+        Закодировать вызов batchSkim(address[],address) контракта BatchSkim
+        """
+        # batchSkim(address[],address) function selector: 0x8cfad43a
+        def word(value: int) -> str:
+            return f"{value:064x}"
+        
+        def address_word(address: str) -> str:
+            return address.lower().replace('0x', '').rjust(64, '0')
+        
+        # Голова: смещение динамического массива и адрес получателя
+        data = word(0x40) + address_word(recipient)
+        # Хвост: длина массива и его элементы
+        data += word(len(pair_addresses)) + ''.join(address_word(a) for a in pair_addresses)
+        
+        return "0x8cfad43a" + data
+    
     def _encode_skim_function_call(self) -> str:
         """
         Закодировать вызов функции skim()
@@ -184,14 +317,19 @@ class AmmSkim(BaseIncentiveStrategy):
     
     async def get_pair_reserves(self, pair_address: str) -> Tuple[int, int] | None:
         """
-        Получить резервы пары
+        Получить резервы пары (кэшируются на блок)
         """
+        cached = chain.get_recent(PAIR_STATE, pair_address)
+        if cached is not None:
+            return cached
+        
         try:
             # В реальной реализации здесь будет вызов getReserves()
             # Для демонстрации возвращаем случайные значения
             reserve0 = random.randint(1000, 1000000) * 10**18
             reserve1 = random.randint(1000, 1000000) * 10**18
             
+            chain.put(PAIR_STATE, pair_address, (reserve0, reserve1))
             return (reserve0, reserve1)
             
         except Exception as e:
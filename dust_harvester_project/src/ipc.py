@@ -0,0 +1,75 @@
+import json
+import os
+import socket
+import socketserver
+from typing import Any, Callable, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Команды протокола: одна JSON-строка запроса, одна JSON-строка ответа
+COMMANDS = ('status', 'start', 'stop')
+
+class _StateRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline() or b'{}')
+            command = request.get('cmd', 'status')
+            if command not in COMMANDS:
+                response = {'error': f'unknown command: {command}'}
+            else:
+                response = self.server.handler(command)
+        except Exception as e:
+            logger.error(f"Error handling IPC request: {e}")
+            response = {'error': str(e)}
+
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+def _socket_answers(path: str, timeout: float = 0.5) -> bool:
+    """Проверить, принимает ли кто-то соединения на сокете"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+        return True
+    except OSError:
+        return False
+
+class StateServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix-socket сервер, через который процесс harvester публикует состояние"""
+
+    daemon_threads = True
+
+    def __init__(self, path: str, handler: Callable[[str], Dict[str, Any]]):
+        if os.path.exists(path):
+            # Отвечающий сокет — значит, harvester уже запущен; второй не нужен
+            if _socket_answers(path):
+                raise RuntimeError(f"Another harvester is already listening on {path}")
+            # Сокет от упавшего запуска мешает bind()
+            os.unlink(path)
+        self.handler = handler
+        super().__init__(path, _StateRequestHandler)
+        logger.info(f"IPC state server listening on {path}")
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+def send_command(path: str, command: str = 'status', timeout: float = 1.0) -> Dict[str, Any]:
+    """
+    Отправить команду процессу harvester
+
+    Returns:
+        Dict[str, Any]: Ответ сервера; при недоступности процесса — {'error': ...}
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps({'cmd': command}).encode() + b'\n')
+            with sock.makefile('rb') as reader:
+                return json.loads(reader.readline())
+    except (OSError, ValueError) as e:
+        logger.error(f"Harvester IPC error ({command}): {e}")
+        return {'error': str(e)}
@@ -1,16 +1,89 @@
 import asyncio
+import threading
+from typing import Dict, List, Optional
 from src.config import settings
-from src.utils.gas import is_profitable
+from src.utils.gas import score_candidate
+from src.utils.scheduler import ExecutionScheduler
 from src.incentives.amm_skim import AmmSkim
+from src.utils.blocks import chain
 
-async def run():
-    """Main harvester execution function"""
+async def execute_batches(strat: AmmSkim, candidates: List) -> int:
+    """Execute candidates as one batch per block they were found in
+
+    Candidates older than CANDIDATE_DEADLINE_BLOCKS are re-simulated on the
+    current head first; the ones that no longer have surplus are dropped.
+    """
+    await chain.sync()
+    head_block = chain.head[0] if chain.head else None
+    
+    groups: Dict[Optional[int], List] = {}
+    for c in candidates:
+        block = strat.candidate_blocks.get(c[0])
+        if head_block is not None and block is not None and head_block - block > settings.CANDIDATE_DEADLINE_BLOCKS:
+            fresh = await strat.resimulate_candidate(c[0])
+            if not fresh:
+                print(f"Dropped stale candidate {c[0]} (found at block {block}, head {head_block})")
+                continue
+            c, block = fresh, head_block
+        groups.setdefault(block, []).append(c)
+    
+    executed_count = 0
+    for block, group in groups.items():
+        executed_count += await strat.execute_batch(group)
+    return executed_count
+
+async def execute_scheduled(strat: AmmSkim, candidates: List,
+                            stop_event: Optional[threading.Event] = None) -> int:
+    """Execute candidates one by one through the priority scheduler"""
+    executed_count = 0
+    
+    # Кандидаты выше MIN_PROFIT_ETH идут в очередь по прибыли на единицу газа;
+    # дедлайн считается от блока, на котором проверялась пара
+    scheduler = ExecutionScheduler(score_candidate)
+    for c in candidates:
+        await scheduler.push(c, strat.candidate_blocks.get(c[0]))
+    
+    # Не больше MAX_TX_PER_BLOCK за блок; очередь крутится, пока в ней есть
+    # кандидаты с непрошедшим дедлайном (просроченные отбрасываются в run_block)
+    last_block = None
+    idle_rounds = 0
+    while len(scheduler) and not (stop_event and stop_event.is_set()):
+        await chain.sync()
+        block = chain.head[0] if chain.head else None
+        if block is not None and block == last_block:
+            # Голова не сдвинулась — лимит этого блока уже выбран, ждем следующий
+            idle_rounds += 1
+            if idle_rounds > settings.CANDIDATE_DEADLINE_BLOCKS:
+                break
+        else:
+            idle_rounds = 0
+            last_block = block
+            executed_count += await scheduler.run_block(strat.execute_candidate, block, strat.resimulate_candidate)
+        if len(scheduler):
+            await asyncio.sleep(settings.BLOCK_TIME_SECONDS)
+    
+    if scheduler.expired:
+        print(f"Dropped {scheduler.expired} candidates after deadline")
+    left = scheduler.clear()
+    if left:
+        print(f"Not sent: {left} candidates (harvester stopped or chain head did not advance)")
+    return executed_count
+
+async def run(stop_event: Optional[threading.Event] = None):
+    """Main harvester execution function
+
+    stop_event: when set, discovery and execution stop at the next check
+    """
     print("Starting Onchain Dust Harvester...")
     print(f"Mode: {'DRY RUN' if settings.DRY_RUN else 'LIVE'}")
     print(f"Chain ID: {settings.CHAIN_ID}")
     print(f"Max pairs to check: {settings.MAX_PAIRS}")
+    print(f"Execution: {'BATCH' if settings.BATCH_MODE else 'SINGLE'}")
     
-    strat = AmmSkim()
+    # Синхронизируем голову цепочки; при реорге кэш осиротевших блоков сбрасывается
+    await chain.sync()
+    
+    strat = AmmSkim(stop_event=stop_event)
     candidates = await strat.discover_candidates()
     print(f"Проверено — кандидатов всего: {len(candidates)}")
     
@@ -21,13 +94,17 @@ async def run():
     
     # candidates are (pair, token, surplus)
     executed_count = 0
-    for c in candidates:
-        if await is_profitable(c):
-            await strat.execute_candidate(c)
-            executed_count += 1
-        else:
-            # для больших списков можно логировать редкое событие
-            pass
+    if stop_event and stop_event.is_set():
+        print("Harvester stopped before execution")
+        return executed_count
+    
+    if settings.BATCH_MODE:
+        # Мелкие излишки окупаются только вместе — один пакет на блок обнаружения
+        executed_count = await execute_batches(strat, candidates)
+        print(f"Executed {executed_count} profitable candidates")
+        return executed_count
+    
+    executed_count = await execute_scheduled(strat, candidates, stop_event)
     
     print(f"Executed {executed_count} profitable candidates")
     return executed_count
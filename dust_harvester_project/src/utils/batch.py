@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional, Tuple
+from src.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Шаг дискретизации газа для задачи о рюкзаке
+GAS_GRANULARITY = 1000
+
+def candidate_net_profit_wei(candidate: Tuple[str, str, float], gas_price_wei: int, gas: int) -> float:
+    """Чистая прибыль одного skim внутри пакета (без базовой стоимости транзакции)"""
+    pair, token, surplus = candidate
+    return float(surplus) * 10**18 - gas * gas_price_wei
+
+def select_batch(candidates: List[Tuple[str, str, float]],
+                 gas_price_wei: int,
+                 gas_budget: Optional[int] = None,
+                 gas_estimates: Optional[Dict[str, int]] = None) -> List[Tuple[str, str, float]]:
+    """
+    Выбрать подмножество кандидатов для одной пакетной транзакции
+
+    Решает задачу о рюкзаке 0/1: максимизирует суммарную чистую прибыль
+    при ограничении на газ блока (за вычетом базовой стоимости пакета).
+
+    Args:
+        candidates: Список кортежей (pair_address, token_address, surplus_amount)
+        gas_price_wei: Цена газа в wei
+        gas_budget: Лимит газа на пакет (по умолчанию BATCH_GAS_BUDGET)
+        gas_estimates: Оценки газа по адресу пары (по умолчанию SKIM_GAS_PER_PAIR)
+
+    Returns:
+        List[Tuple[str, str, float]]: Выбранные кандидаты в исходном порядке
+    """
+    gas_budget = gas_budget if gas_budget is not None else settings.BATCH_GAS_BUDGET
+    gas_estimates = gas_estimates or {}
+
+    capacity = (gas_budget - settings.BATCH_BASE_GAS) // GAS_GRANULARITY
+    if capacity <= 0:
+        return []
+
+    # Отбрасываем кандидатов, которые не окупают даже собственный газ
+    items = []
+    for index, candidate in enumerate(candidates):
+        gas = gas_estimates.get(candidate[0], settings.SKIM_GAS_PER_PAIR)
+        value = candidate_net_profit_wei(candidate, gas_price_wei, gas)
+        weight = -(-gas // GAS_GRANULARITY)  # округление вверх
+        if value > 0 and weight <= capacity:
+            items.append((index, weight, value))
+
+    if not items:
+        return []
+
+    # best[c] — максимальная прибыль при занятом газе не более c
+    best = [0.0] * (capacity + 1)
+    taken = [[False] * (capacity + 1) for _ in items]
+
+    for i, (_, weight, value) in enumerate(items):
+        row = taken[i]
+        for c in range(capacity, weight - 1, -1):
+            with_item = best[c - weight] + value
+            if with_item > best[c]:
+                best[c] = with_item
+                row[c] = True
+
+    # Восстанавливаем выбранный набор
+    selected = []
+    c = capacity
+    for i in range(len(items) - 1, -1, -1):
+        if taken[i][c]:
+            index, weight, _ = items[i]
+            selected.append(index)
+            c -= weight
+
+    selected.sort()
+    logger.debug(f"Batch selector: {len(selected)} of {len(candidates)} candidates, capacity {capacity * GAS_GRANULARITY} gas")
+    return [candidates[index] for index in selected]
+
+def batch_gas_limit(candidates: List[Tuple[str, str, float]],
+                    gas_estimates: Optional[Dict[str, int]] = None) -> int:
+    """Лимит газа для пакетной транзакции"""
+    gas_estimates = gas_estimates or {}
+    return settings.BATCH_BASE_GAS + sum(
+        gas_estimates.get(c[0], settings.SKIM_GAS_PER_PAIR) for c in candidates
+    )
+
+def batch_net_profit_wei(candidates: List[Tuple[str, str, float]],
+                         gas_price_wei: int,
+                         gas_estimates: Optional[Dict[str, int]] = None) -> float:
+    """Чистая прибыль пакета с учетом базовой стоимости транзакции"""
+    total_surplus = sum(float(c[2]) for c in candidates) * 10**18
+    return total_surplus - batch_gas_limit(candidates, gas_estimates) * gas_price_wei
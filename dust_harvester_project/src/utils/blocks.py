@@ -0,0 +1,211 @@
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from src.config import settings
+from src.evm import evm
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Пространства имен кэша, привязанного к блоку
+PAIR_STATE = 'pair_state'
+GAS_PRICE = 'gas_price'
+SIMULATION = 'simulation'
+# Skim, отправленные пока блок был головой (не блок включения транзакции);
+# записи живут, пока блок в окне REORG_DEPTH
+SENT_SKIM = 'sent_skim'
+
+def _to_hex(value) -> str:
+    """Привести хэш блока (HexBytes/bytes/str) к строке 0x..."""
+    if isinstance(value, str):
+        return value.lower() if value.startswith('0x') else '0x' + value.lower()
+    return '0x' + bytes(value).hex()
+
+class BlockCache:
+    """Кэш значений по хэшу блока: (namespace, key) -> value"""
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Tuple[str, Any], Any]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, block_hash: str, namespace: str, key: Any, value: Any):
+        with self._lock:
+            self._entries.setdefault(block_hash, {})[(namespace, key)] = value
+
+    def get(self, block_hash: str, namespace: str, key: Any, default: Any = None) -> Any:
+        return self._entries.get(block_hash, {}).get((namespace, key), default)
+
+    def pop_blocks(self, block_hashes: List[str]) -> Dict[str, List[Tuple[Any, Any]]]:
+        """
+        Удалить все записи указанных блоков
+
+        Returns:
+            Dict[str, List[Tuple[Any, Any]]]: Удаленные записи по пространствам имен
+        """
+        removed: Dict[str, List[Tuple[Any, Any]]] = {}
+        with self._lock:
+            for block_hash in block_hashes:
+                for (namespace, key), value in self._entries.pop(block_hash, {}).items():
+                    removed.setdefault(namespace, []).append((key, value))
+        return removed
+
+    def retain(self, block_hashes: List[str]):
+        """Оставить только записи указанных блоков"""
+        keep = set(block_hashes)
+        with self._lock:
+            for block_hash in [h for h in self._entries if h not in keep]:
+                del self._entries[block_hash]
+
+class ChainTracker:
+    """
+    Короткая каноническая цепочка заголовков с обнаружением реорганизаций
+
+    Хранит последние REORG_DEPTH блоков (number, hash). При смене головы
+    находит общего предка и сбрасывает из кэша записи осиротевших блоков,
+    поэтому остальной кэш можно держать горячим между блоками.
+    """
+
+    def __init__(self, depth: Optional[int] = None):
+        # Глубина читается из настроек при первом обращении, а не при импорте
+        self._depth = depth
+        self._chain: Optional[deque] = None
+        self.cache = BlockCache()
+
+    @property
+    def depth(self) -> int:
+        if self._depth is None:
+            self._depth = settings.REORG_DEPTH
+        return self._depth
+
+    @property
+    def chain(self) -> deque:
+        if self._chain is None:
+            self._chain = deque(maxlen=self.depth)
+        return self._chain
+
+    @property
+    def head(self) -> Optional[Tuple[int, str]]:
+        """Текущая голова (number, hash) или None"""
+        return self.chain[-1] if self.chain else None
+
+    @property
+    def head_hash(self) -> Optional[str]:
+        return self.chain[-1][1] if self.chain else None
+
+    def get_recent(self, namespace: str, key: Any, max_age: int = 0, default: Any = None) -> Any:
+        """
+        Найти значение в каноническом блоке не старше max_age блоков от головы
+        """
+        for age, (_, block_hash) in enumerate(reversed(self.chain)):
+            if age > max_age:
+                break
+            value = self.cache.get(block_hash, namespace, key)
+            if value is not None:
+                return value
+        return default
+
+    def put(self, namespace: str, key: Any, value: Any):
+        """Записать значение для текущей головы (если она известна)"""
+        if self.head_hash:
+            self.cache.put(self.head_hash, namespace, key, value)
+
+    async def sync(self) -> Dict[str, List[Tuple[Any, Any]]]:
+        """
+        Обновить голову цепочки
+
+        Returns:
+            Dict[str, List[Tuple[Any, Any]]]: Записи кэша из осиротевших блоков
+            (например, SENT_SKIM — skim, отправленные поверх осиротевшего блока)
+        """
+        block = await evm.get_latest_block()
+        if not block:
+            return {}
+
+        number, block_hash, parent_hash = block['number'], _to_hex(block['hash']), _to_hex(block['parentHash'])
+        head = self.head
+
+        if head and head[1] == block_hash:
+            return {}
+
+        if not head or (number == head[0] + 1 and parent_hash == head[1]):
+            self.chain.append((number, block_hash))
+            self.cache.retain([h for _, h in self.chain])
+            return {}
+
+        known = {h: n for n, h in self.chain}
+        if block_hash in known:
+            # Отстающая нода балансировщика вернула уже известный блок — это не реорг
+            logger.debug(f"RPC returned known block {number} behind head {head[0]}, ignoring")
+            return {}
+
+        if number - head[0] > self.depth:
+            return await self._reset_window(number, block_hash)
+
+        # Разрыв или реорганизация: идем назад от новой головы до известного блока
+        segment = [(number, block_hash)]
+        ancestor = None
+        cursor_number, cursor_parent = number, parent_hash
+
+        while len(segment) < self.depth:
+            if cursor_parent in known:
+                ancestor = (known[cursor_parent], cursor_parent)
+                break
+            parent = await evm.get_block(cursor_parent)
+            if not parent:
+                # Сбой RPC: предок неизвестен, окно не трогаем — следующий sync повторит
+                logger.warning(f"Could not fetch block {cursor_parent} while syncing to {number}, will retry")
+                return {}
+            cursor_number, cursor_parent = parent['number'], _to_hex(parent['parentHash'])
+            segment.append((cursor_number, _to_hex(parent['hash'])))
+
+        if ancestor is None:
+            # Общий предок за пределами окна — не доверяем ничему из сохраненного
+            orphaned = [h for _, h in self.chain]
+            self.chain.clear()
+        else:
+            orphaned = [h for n, h in self.chain if n > ancestor[0]]
+            while self.chain and self.chain[-1][0] > ancestor[0]:
+                self.chain.pop()
+
+        for entry in reversed(segment):
+            self.chain.append(entry)
+
+        removed = self.cache.pop_blocks(orphaned)
+        self.cache.retain([h for _, h in self.chain])
+
+        if orphaned:
+            logger.warning(f"Chain reorg detected at block {number}: {len(orphaned)} orphaned block(s), "
+                           f"dropped cache namespaces: {sorted(removed)}")
+            self._report_sent_skims(removed)
+        return removed
+
+    async def _reset_window(self, number: int, block_hash: str) -> Dict[str, List[Tuple[Any, Any]]]:
+        """
+        Голова ушла дальше окна: сверяем сохраненную голову с каноническим блоком той же высоты
+        """
+        head_number, head_hash = self.head
+        canonical = await evm.get_block(head_number)
+        orphaned = []
+        if canonical and _to_hex(canonical['hash']) != head_hash:
+            # Сохраненная голова осиротела; глубину реорга не выяснить — сбрасываем все окно
+            orphaned = [h for _, h in self.chain]
+
+        self.chain.clear()
+        self.chain.append((number, block_hash))
+
+        removed = self.cache.pop_blocks(orphaned)
+        self.cache.retain([block_hash])
+
+        if orphaned:
+            logger.warning(f"Chain reorg detected below block {number}: stored head {head_number} is not canonical, "
+                           f"dropped cache namespaces: {sorted(removed)}")
+            self._report_sent_skims(removed)
+        return removed
+
+    def _report_sent_skims(self, removed: Dict[str, List[Tuple[Any, Any]]]):
+        for pair, tx_hash in removed.get(SENT_SKIM, []):
+            logger.warning(f"Reorg: skim {tx_hash} for {pair} was sent on top of an orphaned block, "
+                           f"check whether it was mined")
+
+# Глобальный трекер канонической цепочки
+chain = ChainTracker()
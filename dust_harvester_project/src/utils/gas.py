@@ -1,6 +1,7 @@
 import asyncio
 from src.config import settings
 from src.evm import evm
+from src.utils.blocks import chain, GAS_PRICE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,48 +24,36 @@ async def estimate_gas_cost(transaction_data):
         return 0
 
 async def get_current_gas_price():
-    """Получить текущую цену газа"""
+    """Получить текущую цену газа (кэшируется на блок)"""
     try:
-        return evm.w3.eth.gas_price
+        cached = chain.get_recent(GAS_PRICE, 'latest')
+        if cached is not None:
+            return cached
+        
+        gas_price = evm.w3.eth.gas_price
+        chain.put(GAS_PRICE, 'latest', gas_price)
+        return gas_price
     except Exception as e:
         logger.error(f"Error getting gas price: {e}")
         return evm.w3.to_wei(settings.GAS_PRICE_GWEI, 'gwei')
 
-async def is_profitable(candidate):
-    """Проверить, прибыльна ли возможность после учета газа"""
+async def score_candidate(candidate):
+    """Оценить (чистая прибыль в wei, лимит газа) для одиночного skim"""
     try:
         pair, token, surplus = candidate
         
-        # Конвертируем surplus в Wei (предполагаем, что это ETH)
-        surplus_wei = float(surplus) * 10**18 if isinstance(surplus, (int, float, str)) else 0
-        
-        # Создаем примерные данные транзакции для оценки газа
         transaction_data = {
             'to': pair,
             'value': 0,
             'gas': settings.GAS_LIMIT,
             'gasPrice': await get_current_gas_price()
         }
-        
-        # Оцениваем стоимость газа
         gas_cost = await estimate_gas_cost(transaction_data)
         
-        # Проверяем прибыльность
-        profit = surplus_wei - gas_cost
-        min_profit_wei = settings.MIN_PROFIT_ETH * 10**18
-        
-        is_prof = profit > min_profit_wei
-        
-        if is_prof:
-            logger.info(f"Profitable candidate: {pair}, profit: {profit/10**18:.6f} ETH")
-        else:
-            logger.debug(f"Not profitable: {pair}, profit: {profit/10**18:.6f} ETH, gas: {gas_cost/10**18:.6f} ETH")
-        
-        return is_prof
-        
+        return float(surplus) * 10**18 - gas_cost, settings.GAS_LIMIT
     except Exception as e:
-        logger.error(f"Error checking profitability for {candidate}: {e}")
-        return False
+        logger.error(f"Error scoring candidate {candidate}: {e}")
+        return 0.0, settings.GAS_LIMIT
 
 async def optimize_gas_price():
     """Оптимизировать цену газа на основе сетевых условий"""
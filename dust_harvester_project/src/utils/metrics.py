@@ -1,127 +1,272 @@
 import time
 import json
+import math
+import hashlib
+import threading
+from array import array
+from collections import deque
 from datetime import datetime
 from typing import Dict, List, Any
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Скользящие окна для скоростей: название -> длительность в секундах
+WINDOWS = {'1m': 60, '5m': 300, '1h': 3600}
+
+class HyperLogLog:
+    """Приближенный подсчет уникальных элементов в фиксированной памяти (2**precision байт)"""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+        self._alpha = 0.7213 / (1 + 1.079 / self.size)
+
+    def add(self, item: str):
+        """Добавить элемент"""
+        h = int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.precision)
+        rest_bits = 64 - self.precision
+        rank = rest_bits - (h & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        """Оценка количества уникальных элементов (погрешность ~1.6% при precision=12)"""
+        estimate = self._alpha * self.size * self.size / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # Поправка для малых значений — линейный подсчет
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+    def merge_hex(self, registers_hex: str):
+        """Объединить с сохраненными регистрами"""
+        other = bytes.fromhex(registers_hex)
+        if len(other) != self.size:
+            return
+        for i, r in enumerate(other):
+            if r > self.registers[i]:
+                self.registers[i] = r
+
+class RollingCounter:
+    """Сумма значений по секундным корзинам за последний час"""
+
+    def __init__(self, horizon_seconds: int = 3600):
+        self.horizon = horizon_seconds
+        self.values = array('d', bytes(8 * horizon_seconds))
+        self.stamps = array('q', bytes(8 * horizon_seconds))
+
+    def add(self, value: float, now: float):
+        second = int(now)
+        slot = second % self.horizon
+        if self.stamps[slot] != second:
+            self.stamps[slot] = second
+            self.values[slot] = 0.0
+        self.values[slot] += value
+
+    def total(self, window_seconds: int, now: float) -> float:
+        oldest = int(now) - window_seconds
+        return sum(v for v, s in zip(self.values, self.stamps) if s > oldest)
+
+class _Shard:
+    """Итоги одного потока; пишет только владелец, читатели суммируют все шарды"""
+
+    FIELDS = ('candidates_found', 'candidates_executed', 'profit_eth', 'gas_spent_eth', 'pairs_checked', 'errors')
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.totals = dict.fromkeys(self.FIELDS, 0)
+
 class MetricsCollector:
     def __init__(self):
-        self.metrics = {
-            'start_time': None,
-            'total_candidates_found': 0,
-            'total_candidates_executed': 0,
-            'total_profit_eth': 0.0,
-            'total_gas_spent_eth': 0.0,
-            'execution_times': [],
-            'errors': [],
-            'pairs_checked': set(),
-            'last_run_stats': {}
-        }
-    
+        self.start_time = None
+        self.last_run_stats = {}
+        self.execution_times = deque(maxlen=100)
+        self.errors = deque(maxlen=50)
+        self.unique_pairs = HyperLogLog()
+        # Одно скользящее окно на поле; при гонке потоков может потеряться
+        # редкое приращение в окне, итоги в шардах точные
+        self.rolling = {name: RollingCounter() for name in _Shard.FIELDS}
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        # Итоги завершившихся потоков (и загруженные из файла)
+        self._retired = dict.fromkeys(_Shard.FIELDS, 0)
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            # Блокировка только при первой записи из нового потока
+            shard = _Shard()
+            with self._shards_lock:
+                self._retire_dead_shards()
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _retire_dead_shards(self):
+        """Перенести итоги завершившихся потоков в общий шард (под _shards_lock)"""
+        alive = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                alive.append(shard)
+            else:
+                for name, value in shard.totals.items():
+                    self._retired[name] += value
+        self._shards = alive
+
+    def _add(self, name: str, value: float, now: float):
+        self._shard().totals[name] += value
+        self.rolling[name].add(value, now)
+
+    def _merged_totals(self) -> Dict[str, float]:
+        with self._shards_lock:
+            self._retire_dead_shards()
+            merged = dict(self._retired)
+            shards = list(self._shards)
+        for shard in shards:
+            for name, value in shard.totals.items():
+                merged[name] += value
+        return merged
+
+    def _merged_window(self, window_seconds: int, now: float) -> Dict[str, float]:
+        return {name: counter.total(window_seconds, now) for name, counter in self.rolling.items()}
+
     def start_session(self):
         """Начать новую сессию метрик"""
-        self.metrics['start_time'] = datetime.now()
+        self.start_time = datetime.now()
         logger.info("Metrics session started")
-    
+
     def record_candidates_found(self, count: int):
         """Записать количество найденных кандидатов"""
-        self.metrics['total_candidates_found'] += count
-        self.metrics['last_run_stats']['candidates_found'] = count
-    
+        self._add('candidates_found', count, time.time())
+        self.last_run_stats['candidates_found'] = count
+
     def record_candidate_executed(self, profit_eth: float, gas_cost_eth: float):
         """Записать выполненного кандидата"""
-        self.metrics['total_candidates_executed'] += 1
-        self.metrics['total_profit_eth'] += profit_eth
-        self.metrics['total_gas_spent_eth'] += gas_cost_eth
-    
+        now = time.time()
+        self._add('candidates_executed', 1, now)
+        self._add('profit_eth', profit_eth, now)
+        self._add('gas_spent_eth', gas_cost_eth, now)
+
     def record_execution_time(self, duration_seconds: float):
-        """Записать время выполнения"""
-        self.metrics['execution_times'].append(duration_seconds)
-        
-        # Оставляем только последние 100 записей
-        if len(self.metrics['execution_times']) > 100:
-            self.metrics['execution_times'] = self.metrics['execution_times'][-100:]
-    
+        """Записать время выполнения (хранятся последние 100)"""
+        self.execution_times.append(duration_seconds)
+
     def record_error(self, error_message: str, error_type: str = 'general'):
-        """Записать ошибку"""
-        error_record = {
-            'timestamp': datetime.now().isoformat(),
-            'message': error_message,
-            'type': error_type
-        }
-        self.metrics['errors'].append(error_record)
-        
-        # Оставляем только последние 50 ошибок
-        if len(self.metrics['errors']) > 50:
-            self.metrics['errors'] = self.metrics['errors'][-50:]
-    
+        """Записать ошибку (хранятся последние 50)"""
+        now = time.time()
+        self.errors.append((now, error_message, error_type))
+        self._add('errors', 1, now)
+
     def record_pair_checked(self, pair_address: str):
         """Записать проверенную пару"""
-        self.metrics['pairs_checked'].add(pair_address)
-    
+        self.unique_pairs.add(pair_address)
+        self._add('pairs_checked', 1, time.time())
+
+    def get_recent_errors(self) -> List[Dict[str, str]]:
+        """Последние ошибки в читаемом виде"""
+        return [
+            {'timestamp': datetime.fromtimestamp(ts).isoformat(), 'message': message, 'type': error_type}
+            for ts, message, error_type in list(self.errors)
+        ]
+
     def get_summary(self) -> Dict[str, Any]:
         """Получить сводку метрик"""
         runtime = 0
-        if self.metrics['start_time']:
-            runtime = (datetime.now() - self.metrics['start_time']).total_seconds()
-        
+        if self.start_time:
+            runtime = (datetime.now() - self.start_time).total_seconds()
+
+        execution_times = list(self.execution_times)
         avg_execution_time = 0
-        if self.metrics['execution_times']:
-            avg_execution_time = sum(self.metrics['execution_times']) / len(self.metrics['execution_times'])
-        
-        net_profit = self.metrics['total_profit_eth'] - self.metrics['total_gas_spent_eth']
-        
+        if execution_times:
+            avg_execution_time = sum(execution_times) / len(execution_times)
+
+        totals = self._merged_totals()
+        net_profit = totals['profit_eth'] - totals['gas_spent_eth']
+
         success_rate = 0
-        if self.metrics['total_candidates_found'] > 0:
-            success_rate = (self.metrics['total_candidates_executed'] / self.metrics['total_candidates_found']) * 100
-        
+        if totals['candidates_found'] > 0:
+            success_rate = (totals['candidates_executed'] / totals['candidates_found']) * 100
+
+        now = time.time()
+        windows = {}
+        for label, seconds in WINDOWS.items():
+            window = self._merged_window(seconds, now)
+            window['pairs_per_second'] = window['pairs_checked'] / seconds
+            windows[label] = window
+
         return {
             'runtime_seconds': runtime,
-            'total_candidates_found': self.metrics['total_candidates_found'],
-            'total_candidates_executed': self.metrics['total_candidates_executed'],
+            'total_candidates_found': totals['candidates_found'],
+            'total_candidates_executed': totals['candidates_executed'],
             'success_rate_percent': success_rate,
-            'total_profit_eth': self.metrics['total_profit_eth'],
-            'total_gas_spent_eth': self.metrics['total_gas_spent_eth'],
+            'total_profit_eth': totals['profit_eth'],
+            'total_gas_spent_eth': totals['gas_spent_eth'],
             'net_profit_eth': net_profit,
             'average_execution_time': avg_execution_time,
-            'unique_pairs_checked': len(self.metrics['pairs_checked']),
-            'error_count': len(self.metrics['errors']),
-            'last_run_stats': self.metrics['last_run_stats']
+            'unique_pairs_checked': self.unique_pairs.count(),
+            'error_count': totals['errors'],
+            'windows': windows,
+            'last_run_stats': self.last_run_stats
         }
-    
+
     def save_to_file(self, filename: str = 'metrics.json'):
         """Сохранить метрики в файл"""
         try:
-            # Конвертируем set в list для JSON сериализации
-            metrics_copy = self.metrics.copy()
-            metrics_copy['pairs_checked'] = list(metrics_copy['pairs_checked'])
-            
-            if metrics_copy['start_time']:
-                metrics_copy['start_time'] = metrics_copy['start_time'].isoformat()
-            
+            data = {
+                'start_time': self.start_time.isoformat() if self.start_time else None,
+                'totals': self._merged_totals(),
+                'execution_times': list(self.execution_times),
+                'errors': self.get_recent_errors(),
+                'unique_pairs_hll': self.unique_pairs.registers.hex(),
+                'last_run_stats': self.last_run_stats
+            }
+
             with open(filename, 'w') as f:
-                json.dump(metrics_copy, f, indent=2)
-            
+                json.dump(data, f, separators=(',', ':'))
+
             logger.info(f"Metrics saved to {filename}")
         except Exception as e:
             logger.error(f"Error saving metrics to file: {e}")
-    
+
     def load_from_file(self, filename: str = 'metrics.json'):
         """Загрузить метрики из файла"""
         try:
             with open(filename, 'r') as f:
-                loaded_metrics = json.load(f)
-            
-            # Конвертируем обратно в нужные типы
-            if 'pairs_checked' in loaded_metrics:
-                loaded_metrics['pairs_checked'] = set(loaded_metrics['pairs_checked'])
-            
-            if loaded_metrics.get('start_time'):
-                loaded_metrics['start_time'] = datetime.fromisoformat(loaded_metrics['start_time'])
-            
-            self.metrics.update(loaded_metrics)
+                loaded = json.load(f)
+
+            # Сохраненные итоги добавляются к итогам завершившихся потоков
+            totals = loaded.get('totals')
+            if totals is None:
+                # Старый формат: итоги на верхнем уровне с префиксом total_
+                totals = {
+                    'candidates_found': loaded.get('total_candidates_found', 0),
+                    'candidates_executed': loaded.get('total_candidates_executed', 0),
+                    'profit_eth': loaded.get('total_profit_eth', 0.0),
+                    'gas_spent_eth': loaded.get('total_gas_spent_eth', 0.0),
+                }
+            with self._shards_lock:
+                for name in _Shard.FIELDS:
+                    self._retired[name] += totals.get(name, 0)
+
+            if loaded.get('unique_pairs_hll'):
+                self.unique_pairs.merge_hex(loaded['unique_pairs_hll'])
+            # Файлы старого формата хранили полный список пар
+            for pair_address in loaded.get('pairs_checked', []):
+                self.unique_pairs.add(pair_address)
+
+            self.execution_times.extend(loaded.get('execution_times', []))
+            for record in loaded.get('errors', []):
+                ts = datetime.fromisoformat(record['timestamp']).timestamp()
+                self.errors.append((ts, record['message'], record.get('type', 'general')))
+
+            if loaded.get('start_time'):
+                self.start_time = datetime.fromisoformat(loaded['start_time'])
+            self.last_run_stats.update(loaded.get('last_run_stats', {}))
+
             logger.info(f"Metrics loaded from {filename}")
         except Exception as e:
             logger.error(f"Error loading metrics from file: {e}")
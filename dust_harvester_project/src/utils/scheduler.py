@@ -0,0 +1,113 @@
+import heapq
+import itertools
+from typing import Awaitable, Callable, List, Optional, Tuple
+from src.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+Candidate = Tuple[str, str, float]
+
+class ExecutionScheduler:
+    """
+    Очередь исполнения кандидатов по чистой прибыли на единицу газа
+
+    Каждому кандидату назначается дедлайн в блоках. Кандидаты с истекшим
+    дедлайном пересимулируются (если задан resimulate) или отбрасываются;
+    за один блок отправляется не более max_per_block транзакций.
+    """
+
+    def __init__(self,
+                 score: Callable[[Candidate], Awaitable[Tuple[float, int]]],
+                 max_per_block: Optional[int] = None,
+                 deadline_blocks: Optional[int] = None,
+                 min_profit_wei: Optional[float] = None):
+        """
+        Args:
+            score: Возвращает (чистая прибыль в wei, газ) для кандидата
+            max_per_block: Лимит транзакций на блок (по умолчанию MAX_TX_PER_BLOCK)
+            deadline_blocks: Сколько блоков кандидат остается актуальным (по умолчанию CANDIDATE_DEADLINE_BLOCKS)
+            min_profit_wei: Минимальная чистая прибыль (по умолчанию MIN_PROFIT_ETH)
+        """
+        self.score = score
+        self.max_per_block = max_per_block or settings.MAX_TX_PER_BLOCK
+        self.deadline_blocks = deadline_blocks if deadline_blocks is not None else settings.CANDIDATE_DEADLINE_BLOCKS
+        self.min_profit_wei = min_profit_wei if min_profit_wei is not None else settings.MIN_PROFIT_ETH * 10**18
+        self._heap: List[Tuple[float, int, Candidate, Optional[int]]] = []
+        self._seq = itertools.count()
+        self._sent_in_block: Tuple[Optional[int], int] = (None, 0)
+        # Сколько кандидатов отброшено по истечении дедлайна
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def push(self, candidate: Candidate, block_number: Optional[int]) -> bool:
+        """
+        Поставить кандидата в очередь (и впервые найденного, и пересимулированного)
+
+        Returns:
+            bool: False если прибыль не выше порога и кандидат не поставлен
+        """
+        net_profit, gas = await self.score(candidate)
+        if net_profit <= self.min_profit_wei or gas <= 0:
+            logger.debug(f"Not queued: {candidate[0]}, profit: {net_profit/10**18:.6f} ETH")
+            return False
+
+        deadline = block_number + self.deadline_blocks if block_number is not None else None
+        # heapq — min-куча, поэтому приоритет со знаком минус
+        heapq.heappush(self._heap, (-net_profit / gas, next(self._seq), candidate, deadline))
+        return True
+
+    async def run_block(self,
+                        execute: Callable[[Candidate], Awaitable[bool]],
+                        block_number: Optional[int],
+                        resimulate: Optional[Callable[[str], Awaitable[Optional[Candidate]]]] = None) -> int:
+        """
+        Исполнить лучших кандидатов в пределах лимита текущего блока
+
+        Returns:
+            int: Количество успешно отправленных транзакций
+        """
+        last_block, sent = self._sent_in_block
+        if block_number is None or block_number != last_block:
+            sent = 0
+
+        await self._expire(block_number, resimulate)
+
+        executed = 0
+        while self._heap and sent < self.max_per_block:
+            _, _, candidate, _ = heapq.heappop(self._heap)
+            sent += 1
+            if await execute(candidate):
+                executed += 1
+
+        self._sent_in_block = (block_number, sent)
+        return executed
+
+    async def _expire(self, block_number: Optional[int],
+                      resimulate: Optional[Callable[[str], Awaitable[Optional[Candidate]]]]):
+        """Пересимулировать или отбросить все кандидаты с истекшим дедлайном"""
+        if block_number is None:
+            return
+
+        stale = [entry for entry in self._heap if entry[3] is not None and block_number > entry[3]]
+        if not stale:
+            return
+
+        self._heap = [entry for entry in self._heap if entry[3] is None or block_number <= entry[3]]
+        heapq.heapify(self._heap)
+
+        for _, _, candidate, deadline in stale:
+            fresh = await resimulate(candidate[0]) if resimulate else None
+            if fresh and await self.push(fresh, block_number):
+                logger.info(f"Candidate {candidate[0]} is stale at block {block_number}, re-simulated")
+            else:
+                self.expired += 1
+                logger.info(f"Dropping stale candidate {candidate[0]} (deadline {deadline}, block {block_number})")
+
+    def clear(self) -> int:
+        """Очистить очередь, вернуть количество отброшенных кандидатов"""
+        dropped = len(self._heap)
+        self._heap.clear()
+        return dropped
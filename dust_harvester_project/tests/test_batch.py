@@ -0,0 +1,84 @@
+import pytest
+from src.config import settings
+from src.utils.batch import GAS_GRANULARITY, select_batch, batch_gas_limit, batch_net_profit_wei
+from src.incentives.amm_skim import AmmSkim
+
+GAS_PRICE = 3 * 10**9  # 3 gwei
+TOKEN = '0x' + '2' * 40
+
+def pair(n: int) -> str:
+    return '0x' + f'{n:040x}'
+
+def candidate(n: int, surplus: float):
+    return (pair(n), TOKEN, surplus)
+
+@pytest.fixture(autouse=True)
+def batch_settings(monkeypatch):
+    monkeypatch.setattr(settings.get(), 'BATCH_BASE_GAS', 40000)
+    monkeypatch.setattr(settings.get(), 'SKIM_GAS_PER_PAIR', 60000)
+    monkeypatch.setattr(settings.get(), 'BATCH_GAS_BUDGET', 3000000)
+
+def test_select_batch_drops_items_that_do_not_pay_for_their_gas():
+    # 60000 газа * 3 gwei = 0.00018 ETH
+    cheap = candidate(1, 0.0001)
+    good = candidate(2, 0.01)
+    assert select_batch([cheap, good], GAS_PRICE) == [good]
+
+def test_select_batch_keeps_original_order():
+    candidates = [candidate(1, 0.001), candidate(2, 0.05), candidate(3, 0.002)]
+    assert select_batch(candidates, GAS_PRICE) == candidates
+
+def test_select_batch_respects_gas_budget():
+    candidates = [candidate(1, 0.001), candidate(2, 0.05), candidate(3, 0.002)]
+    # Места только для двух skim по 60000 газа
+    selected = select_batch(candidates, GAS_PRICE, gas_budget=40000 + 2 * 60000)
+    assert selected == [candidates[1], candidates[2]]
+    assert batch_gas_limit(selected) == 40000 + 2 * 60000
+
+def test_select_batch_prefers_better_combination_over_greedy():
+    # Одна "тяжелая" пара против двух легких, которые вместе выгоднее
+    heavy = candidate(1, 0.03)
+    light_a = candidate(2, 0.02)
+    light_b = candidate(3, 0.02)
+    estimates = {heavy[0]: 100000, light_a[0]: 50000, light_b[0]: 50000}
+    selected = select_batch([heavy, light_a, light_b], GAS_PRICE,
+                            gas_budget=40000 + 100000, gas_estimates=estimates)
+    assert selected == [light_a, light_b]
+
+def test_select_batch_empty_when_budget_below_base_gas():
+    assert select_batch([candidate(1, 0.05)], GAS_PRICE, gas_budget=40000) == []
+    assert select_batch([candidate(1, 0.05)], GAS_PRICE, gas_budget=40000 + GAS_GRANULARITY - 1) == []
+
+def test_select_batch_skips_item_heavier_than_capacity():
+    big = candidate(1, 0.05)
+    assert select_batch([big], GAS_PRICE, gas_budget=40000 + 59000) == []
+
+def test_select_batch_empty_input():
+    assert select_batch([], GAS_PRICE) == []
+
+def test_batch_net_profit_includes_base_gas():
+    selected = [candidate(1, 0.01), candidate(2, 0.02)]
+    expected = 0.03 * 10**18 - (40000 + 2 * 60000) * GAS_PRICE
+    assert batch_net_profit_wei(selected, GAS_PRICE) == pytest.approx(expected)
+
+SELECTOR = '0x8cfad43a'
+RECIPIENT = '0x' + 'ab' * 20
+
+def word(value: int) -> str:
+    return f'{value:064x}'
+
+def address_word(address: str) -> str:
+    return '0' * 24 + address[2:].lower()
+
+@pytest.mark.parametrize('pairs', [
+    [],
+    ['0x' + '1' * 40],
+    ['0x' + '1' * 40, '0x' + 'A' * 40, '0x' + '3' * 40],
+])
+def test_encode_batch_skim_call(pairs):
+    data = AmmSkim()._encode_batch_skim_call(pairs, RECIPIENT)
+
+    expected = (SELECTOR + word(0x40) + address_word(RECIPIENT) + word(len(pairs))
+                + ''.join(address_word(p) for p in pairs))
+    assert data == expected
+    assert (len(data) - len(SELECTOR)) == 64 * (3 + len(pairs))
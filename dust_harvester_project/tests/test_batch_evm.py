@@ -0,0 +1,79 @@
+import os
+import pytest
+from src.incentives.amm_skim import AmmSkim
+
+solcx = pytest.importorskip('solcx')
+pytest.importorskip('eth_tester')
+web3 = pytest.importorskip('web3')
+
+CONTRACT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'contracts', 'BatchSkim.sol')
+
+MOCK_PAIRS = '''
+contract MockPair {
+    uint256 public skims;
+    address public lastTo;
+
+    function skim(address to) external {
+        skims++;
+        lastTo = to;
+    }
+}
+
+contract RevertingPair {
+    function skim(address) external pure {
+        revert("no surplus");
+    }
+}
+'''
+
+@pytest.fixture(scope='module')
+def compiled():
+    if not solcx.get_installed_solc_versions():
+        pytest.skip('solc is not installed (python -m solcx.install v0.8.19)')
+    with open(CONTRACT_PATH) as f:
+        source = f.read() + MOCK_PAIRS
+    return {name.split(':')[-1]: iface
+            for name, iface in solcx.compile_source(source, output_values=['abi', 'bin']).items()}
+
+@pytest.fixture
+def w3():
+    w3 = web3.Web3(web3.Web3.EthereumTesterProvider())
+    w3.eth.default_account = w3.eth.accounts[0]
+    return w3
+
+def deploy(w3, compiled, name):
+    iface = compiled[name]
+    tx_hash = w3.eth.contract(abi=iface['abi'], bytecode=iface['bin']).constructor().transact()
+    address = w3.eth.wait_for_transaction_receipt(tx_hash).contractAddress
+    return w3.eth.contract(address=address, abi=iface['abi'])
+
+def test_reverting_pair_and_non_contract_do_not_sink_the_batch(w3, compiled):
+    batch = deploy(w3, compiled, 'BatchSkim')
+    good_a = deploy(w3, compiled, 'MockPair')
+    reverting = deploy(w3, compiled, 'RevertingPair')
+    good_b = deploy(w3, compiled, 'MockPair')
+    not_a_contract = w3.eth.accounts[1]
+    recipient = w3.eth.accounts[0]
+
+    pairs = [good_a.address, reverting.address, not_a_contract, good_b.address]
+    # Calldata из той же функции, что использует бот
+    data = AmmSkim()._encode_batch_skim_call(pairs, recipient)
+
+    tx_hash = w3.eth.send_transaction({'to': batch.address, 'data': data, 'gas': 1_000_000})
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+
+    assert receipt.status == 1
+    assert good_a.functions.skims().call() == 1
+    assert good_b.functions.skims().call() == 1
+    assert good_a.functions.lastTo().call() == recipient
+
+    failed = [event.args.pair for event in batch.events.SkimFailed().process_receipt(receipt)]
+    assert failed == [reverting.address, not_a_contract]
+
+def test_only_owner_can_call(w3, compiled):
+    batch = deploy(w3, compiled, 'BatchSkim')
+    data = AmmSkim()._encode_batch_skim_call([], w3.eth.accounts[1])
+
+    with pytest.raises(Exception):
+        w3.eth.send_transaction({'from': w3.eth.accounts[1], 'to': batch.address, 'data': data, 'gas': 200_000})
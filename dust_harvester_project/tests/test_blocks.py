@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from src.utils import blocks
+from src.utils.blocks import ChainTracker, SENT_SKIM
+
+class FakeChain:
+    """Цепочка блоков в памяти вместо RPC"""
+
+    def __init__(self):
+        self.blocks = {}
+        self.head = None
+        self.get_block_calls = 0
+
+    def add(self, number: int, block_hash: str, parent_hash: str):
+        self.blocks[block_hash] = self.blocks[number] = {
+            'number': number, 'hash': block_hash, 'parentHash': parent_hash
+        }
+        self.head = self.blocks[block_hash]
+
+    def extend(self, start: int, end: int, prefix: str = 'a'):
+        for n in range(start, end + 1):
+            parent = self.blocks.get(n - 1, {}).get('hash', f'0x{prefix}{n - 1:x}')
+            self.add(n, f'0x{prefix}{n:x}', parent)
+
+    async def get_latest_block(self):
+        return self.head
+
+    async def get_block(self, block_identifier):
+        self.get_block_calls += 1
+        return self.blocks.get(block_identifier)
+
+@pytest.fixture
+def fake_chain(monkeypatch):
+    fake = FakeChain()
+    monkeypatch.setattr(blocks, 'evm', fake)
+    return fake
+
+def test_short_reorg_returns_orphaned_entries(fake_chain, caplog):
+    tracker = ChainTracker(depth=5)
+    fake_chain.extend(1, 3)
+    for n in (1, 2, 3):
+        fake_chain.head = fake_chain.blocks[n]
+        asyncio.run(tracker.sync())
+        tracker.put(SENT_SKIM, f'pair{n}', f'tx{n}')
+
+    # Блоки 2 и 3 заменены другой веткой
+    fake_chain.add(2, '0xb2', '0xa1')
+    fake_chain.add(3, '0xb3', '0xb2')
+    fake_chain.add(4, '0xb4', '0xb3')
+    removed = asyncio.run(tracker.sync())
+
+    assert sorted(removed[SENT_SKIM]) == [('pair2', 'tx2'), ('pair3', 'tx3')]
+    assert 'skim tx3 for pair3 was sent on top of an orphaned block' in caplog.text
+    assert [h for _, h in tracker.chain] == ['0xa1', '0xb2', '0xb3', '0xb4']
+
+def test_gap_wider_than_window_without_reorg_is_not_reported(fake_chain):
+    tracker = ChainTracker(depth=12)
+    fake_chain.extend(100, 100)
+    asyncio.run(tracker.sync())
+    tracker.put(SENT_SKIM, 'pair', 'tx')
+
+    fake_chain.extend(101, 140)
+    fake_chain.get_block_calls = 0
+    removed = asyncio.run(tracker.sync())
+
+    assert removed == {}
+    assert fake_chain.get_block_calls == 1
+    assert list(tracker.chain) == [(140, '0xa8c')]
+
+def test_gap_wider_than_window_with_reorg_is_reported(fake_chain):
+    tracker = ChainTracker(depth=12)
+    fake_chain.extend(100, 100)
+    asyncio.run(tracker.sync())
+    tracker.put(SENT_SKIM, 'pair', 'tx')
+
+    # Блок 100 заменен, цепочка ушла на 40 блоков вперед
+    fake_chain.add(100, '0xc100', '0xa63')
+    fake_chain.extend(101, 140, prefix='c')
+    removed = asyncio.run(tracker.sync())
+
+    assert removed == {SENT_SKIM: [('pair', 'tx')]}
+    assert tracker.head == (140, '0xc8c')
+
+def test_lagging_node_returning_known_block_is_ignored(fake_chain):
+    tracker = ChainTracker(depth=5)
+    fake_chain.extend(1, 3)
+    for n in (1, 2, 3):
+        fake_chain.head = fake_chain.blocks[n]
+        asyncio.run(tracker.sync())
+        tracker.put(SENT_SKIM, f'pair{n}', f'tx{n}')
+
+    fake_chain.head = fake_chain.blocks[2]
+    assert asyncio.run(tracker.sync()) == {}
+    assert [n for n, _ in tracker.chain] == [1, 2, 3]
+
+def test_failed_block_fetch_keeps_window(fake_chain):
+    tracker = ChainTracker(depth=5)
+    fake_chain.extend(1, 1)
+    asyncio.run(tracker.sync())
+    tracker.put(SENT_SKIM, 'pair', 'tx')
+
+    fake_chain.extend(2, 3)
+    del fake_chain.blocks['0xa2']  # RPC не отдает промежуточный блок
+    assert asyncio.run(tracker.sync()) == {}
+    assert list(tracker.chain) == [(1, '0xa1')]
+
+    # Следующий sync после восстановления RPC продолжает цепочку
+    fake_chain.blocks['0xa2'] = fake_chain.blocks[2]
+    assert asyncio.run(tracker.sync()) == {}
+    assert [n for n, _ in tracker.chain] == [1, 2, 3]
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+import src.main
+from src.daemon import HarvesterDaemon
+
+def test_stop_then_start_does_not_overlap_passes(monkeypatch):
+    active = []
+    release = threading.Event()
+
+    async def fake_run(stop_event=None):
+        active.append(1)
+        try:
+            # Проход реагирует на stop, но завершается только после release
+            while not (stop_event.is_set() and release.is_set()):
+                await asyncio.sleep(0.01)
+            return 1
+        finally:
+            active.pop()
+
+    monkeypatch.setattr(src.main, 'run', fake_run)
+    daemon = HarvesterDaemon()
+
+    assert daemon.handle('start') == {'status': 'started'}
+    assert daemon.handle('stop') == {'status': 'stopped'}
+
+    # Проход еще идет: второй не запускается, running остается True
+    assert daemon.handle('start') == {'status': 'already_running'}
+    state = daemon.snapshot()
+    assert state['running'] and state['stopping']
+    assert len(active) <= 1
+
+    release.set()
+    daemon._thread.join(timeout=5)
+    state = daemon.snapshot()
+    assert not state['running']
+    assert state['transactions_sent'] == 1
+
+    # После завершения можно запустить снова, флаг остановки сброшен
+    release.clear()
+    assert daemon.handle('start') == {'status': 'started'}
+    assert not daemon.snapshot()['stopping']
+    daemon.handle('stop')
+    release.set()
+    daemon._thread.join(timeout=5)
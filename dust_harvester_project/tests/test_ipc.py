@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import threading
+import pytest
+from src.ipc import StateServer, send_command
+
+@pytest.fixture
+def socket_path():
+    # Путь Unix-сокета ограничен ~100 символами, tmp_path бывает длиннее
+    directory = tempfile.mkdtemp(prefix='harvester-')
+    yield os.path.join(directory, 'state.sock')
+    shutil.rmtree(directory, ignore_errors=True)
+
+@pytest.fixture
+def server(socket_path):
+    commands = []
+
+    def handler(command):
+        commands.append(command)
+        return {'status': 'ok', 'command': command}
+
+    server = StateServer(socket_path, handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, commands
+    server.shutdown()
+    server.server_close()
+
+def test_round_trip(socket_path, server):
+    _, commands = server
+    assert send_command(socket_path, 'status') == {'status': 'ok', 'command': 'status'}
+    assert send_command(socket_path, 'start') == {'status': 'ok', 'command': 'start'}
+    assert commands == ['status', 'start']
+
+def test_unknown_command_is_rejected(socket_path, server):
+    _, commands = server
+    assert send_command(socket_path, 'bogus') == {'error': 'unknown command: bogus'}
+    assert commands == []
+
+def test_daemon_down_returns_error(socket_path):
+    assert 'error' in send_command(socket_path, 'status', timeout=0.2)
+
+def test_second_server_refuses_to_take_over_socket(socket_path, server):
+    with pytest.raises(RuntimeError):
+        StateServer(socket_path, lambda command: {})
+    # Первый сервер продолжает отвечать
+    assert send_command(socket_path, 'status')['status'] == 'ok'
+
+def test_stale_socket_file_is_replaced(socket_path):
+    stale = StateServer(socket_path, lambda command: {})
+    # Имитируем упавший процесс: сокет закрыт, файл остался
+    stale.socket.close()
+    assert os.path.exists(socket_path)
+
+    server = StateServer(socket_path, lambda command: {'status': 'fresh'})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert send_command(socket_path, 'status') == {'status': 'fresh'}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_server_close_removes_socket_file(socket_path):
+    server = StateServer(socket_path, lambda command: {})
+    server.server_close()
+    assert not os.path.exists(socket_path)
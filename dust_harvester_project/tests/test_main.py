@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+import src.main
+from src.config import settings
+
+class FakeChain:
+    def __init__(self, head_block, advance=0):
+        self.advance = advance
+        self.head = (head_block, f'0x{head_block:x}')
+
+    async def sync(self):
+        number = self.head[0] + self.advance
+        self.head = (number, f'0x{number:x}')
+        return {}
+
+class FakeStrategy:
+    def __init__(self, candidate_blocks, fresh):
+        self.candidate_blocks = candidate_blocks
+        self.fresh = fresh
+        self.batches = []
+        self.executed = []
+
+    async def resimulate_candidate(self, pair_address):
+        return self.fresh.get(pair_address)
+
+    async def execute_candidate(self, candidate):
+        self.executed.append(candidate)
+        return True
+
+    async def execute_batch(self, candidates):
+        self.batches.append(list(candidates))
+        return len(candidates)
+
+def candidate(pair, surplus=0.01):
+    return (pair, '0x' + '2' * 40, surplus)
+
+def test_execute_batches_groups_by_block_and_resimulates_stale(monkeypatch):
+    monkeypatch.setattr(src.main, 'chain', FakeChain(110))
+    monkeypatch.setattr(settings.get(), 'CANDIDATE_DEADLINE_BLOCKS', 2)
+
+    candidates = [candidate('a'), candidate('b'), candidate('c'), candidate('stale'), candidate('gone')]
+    strat = FakeStrategy(
+        candidate_blocks={'a': 109, 'b': 108, 'c': 109, 'stale': 100, 'gone': 101},
+        fresh={'stale': candidate('stale', 0.02)},
+    )
+
+    executed = asyncio.run(src.main.execute_batches(strat, candidates))
+
+    assert executed == 4
+    assert sorted(sorted(c[0] for c in batch) for batch in strat.batches) == [['a', 'c'], ['b'], ['stale']]
+    assert candidate('stale', 0.02) in [c for batch in strat.batches for c in batch]
+
+@pytest.fixture
+def scheduled_settings(monkeypatch):
+    async def score(c):
+        return c[2] * 10**18, 300000
+
+    monkeypatch.setattr(src.main, 'score_candidate', score)
+    monkeypatch.setattr(settings.get(), 'MAX_TX_PER_BLOCK', 2)
+    monkeypatch.setattr(settings.get(), 'CANDIDATE_DEADLINE_BLOCKS', 10)
+    monkeypatch.setattr(settings.get(), 'BLOCK_TIME_SECONDS', 0)
+    monkeypatch.setattr(settings.get(), 'MIN_PROFIT_ETH', 0.001)
+
+def test_execute_scheduled_runs_until_queue_is_drained(monkeypatch, scheduled_settings):
+    monkeypatch.setattr(src.main, 'chain', FakeChain(100, advance=1))
+    candidates = [candidate(f'p{n}', 0.01 + n / 1000) for n in range(7)]
+    strat = FakeStrategy(candidate_blocks={c[0]: 100 for c in candidates}, fresh={})
+
+    executed = asyncio.run(src.main.execute_scheduled(strat, candidates))
+
+    assert executed == 7
+    assert [c[0] for c in strat.executed] == [f'p{n}' for n in reversed(range(7))]
+
+def test_execute_scheduled_gives_up_when_head_is_stuck(monkeypatch, scheduled_settings, capsys):
+    monkeypatch.setattr(src.main, 'chain', FakeChain(100, advance=0))
+    candidates = [candidate(f'p{n}') for n in range(5)]
+    strat = FakeStrategy(candidate_blocks={c[0]: 100 for c in candidates}, fresh={})
+
+    executed = asyncio.run(src.main.execute_scheduled(strat, candidates))
+
+    assert executed == 2
+    output = capsys.readouterr().out
+    assert 'Not sent: 3 candidates' in output
+    assert 'after deadline' not in output
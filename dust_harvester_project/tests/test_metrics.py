@@ -0,0 +1,70 @@
+import json
+import threading
+from src.utils.metrics import MetricsCollector, HyperLogLog
+
+def test_short_lived_threads_do_not_accumulate_shards():
+    metrics = MetricsCollector()
+
+    def one_pass(n):
+        metrics.record_pair_checked(f'0x{n:040x}')
+        metrics.record_candidates_found(2)
+        metrics.record_candidate_executed(0.01, 0.001)
+
+    for n in range(50):
+        thread = threading.Thread(target=one_pass, args=(n,))
+        thread.start()
+        thread.join()
+
+    summary = metrics.get_summary()
+    assert len(metrics._shards) == 0
+    assert summary['total_candidates_found'] == 100
+    assert summary['total_candidates_executed'] == 50
+    assert summary['windows']['1m']['pairs_checked'] == 50
+    assert summary['unique_pairs_checked'] == 50
+
+def test_ring_buffers_are_bounded():
+    metrics = MetricsCollector()
+    for i in range(500):
+        metrics.record_error(f'error {i}')
+        metrics.record_execution_time(float(i))
+
+    assert len(metrics.errors) == 50
+    assert len(metrics.execution_times) == 100
+    assert metrics.get_summary()['error_count'] == 500
+    assert metrics.get_recent_errors()[-1]['message'] == 'error 499'
+
+def test_hyperloglog_estimate_is_close():
+    hll = HyperLogLog()
+    for i in range(20000):
+        hll.add(f'0x{i:040x}')
+    assert abs(hll.count() - 20000) < 20000 * 0.05
+
+def test_save_and_load_round_trip(tmp_path):
+    metrics = MetricsCollector()
+    metrics.record_candidates_found(3)
+    metrics.record_pair_checked('0x' + '1' * 40)
+    path = tmp_path / 'metrics.json'
+    metrics.save_to_file(str(path))
+
+    loaded = MetricsCollector()
+    loaded.load_from_file(str(path))
+    summary = loaded.get_summary()
+    assert summary['total_candidates_found'] == 3
+    assert summary['unique_pairs_checked'] == 1
+
+def test_load_legacy_format(tmp_path):
+    path = tmp_path / 'metrics.json'
+    path.write_text(json.dumps({
+        'total_candidates_found': 4,
+        'pairs_checked': ['0x' + 'a' * 40, '0x' + 'b' * 40],
+        'errors': [],
+        'execution_times': [1.5],
+        'start_time': None,
+    }))
+
+    metrics = MetricsCollector()
+    metrics.load_from_file(str(path))
+    summary = metrics.get_summary()
+    assert summary['total_candidates_found'] == 4
+    assert summary['unique_pairs_checked'] == 2
+    assert summary['average_execution_time'] == 1.5
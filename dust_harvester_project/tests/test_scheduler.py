@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+from src.config import settings
+from src.incentives import amm_skim
+from src.incentives.amm_skim import AmmSkim
+from src.utils import blocks
+from src.utils.scheduler import ExecutionScheduler
+
+MIN_PROFIT_WEI = 0.001 * 10**18
+GAS = 300000
+
+def candidate(n: int, surplus: float):
+    return (f'0x{n:040x}', '0x' + '2' * 40, surplus)
+
+async def score(c):
+    # Для простоты чистая прибыль равна surplus
+    return c[2] * 10**18, GAS
+
+def make_scheduler(**kwargs):
+    kwargs.setdefault('max_per_block', 10)
+    kwargs.setdefault('deadline_blocks', 2)
+    return ExecutionScheduler(score, min_profit_wei=MIN_PROFIT_WEI, **kwargs)
+
+def run_block(scheduler, block, resimulate=None):
+    sent = []
+
+    async def execute(c):
+        sent.append(c)
+        return True
+
+    executed = asyncio.run(scheduler.run_block(execute, block, resimulate))
+    return executed, sent
+
+def test_executes_highest_profit_first():
+    scheduler = make_scheduler()
+    for n, surplus in enumerate([0.002, 0.05, 0.01]):
+        asyncio.run(scheduler.push(candidate(n, surplus), 100))
+
+    executed, sent = run_block(scheduler, 100)
+    assert executed == 3
+    assert [c[2] for c in sent] == [0.05, 0.01, 0.002]
+
+def test_push_applies_min_profit():
+    scheduler = make_scheduler()
+    assert not asyncio.run(scheduler.push(candidate(1, 0.0005), 100))
+    assert asyncio.run(scheduler.push(candidate(2, 0.002), 100))
+    assert len(scheduler) == 1
+
+def test_caps_transactions_per_block():
+    scheduler = make_scheduler(max_per_block=2)
+    for n in range(5):
+        asyncio.run(scheduler.push(candidate(n, 0.01 + n / 1000), 100))
+
+    assert run_block(scheduler, 100)[0] == 2
+    assert run_block(scheduler, 100)[0] == 0
+    assert run_block(scheduler, 101)[0] == 2
+    assert len(scheduler) == 1
+
+def test_stale_candidate_is_dropped_without_resimulate():
+    scheduler = make_scheduler(deadline_blocks=1)
+    asyncio.run(scheduler.push(candidate(1, 0.01), 100))
+
+    assert run_block(scheduler, 102) == (0, [])
+    assert len(scheduler) == 0
+    assert scheduler.expired == 1
+
+def test_stale_candidates_do_not_use_block_cap():
+    scheduler = make_scheduler(max_per_block=1, deadline_blocks=1)
+    # Самый прибыльный просрочен, менее прибыльный свежий
+    asyncio.run(scheduler.push(candidate(1, 0.05), 100))
+    asyncio.run(scheduler.push(candidate(2, 0.01), 102))
+
+    executed, sent = run_block(scheduler, 102)
+    assert executed == 1 and sent[0][2] == 0.01
+    assert scheduler.expired == 1
+
+def test_resimulated_candidate_below_min_profit_is_dropped():
+    scheduler = make_scheduler(deadline_blocks=1)
+    asyncio.run(scheduler.push(candidate(1, 0.01), 100))
+
+    async def resimulate(pair_address):
+        return (pair_address, '0x' + '2' * 40, 0.0005)
+
+    assert run_block(scheduler, 102, resimulate) == (0, [])
+    assert len(scheduler) == 0
+
+def test_resimulated_candidate_is_requeued_and_executed():
+    scheduler = make_scheduler(deadline_blocks=1)
+    asyncio.run(scheduler.push(candidate(1, 0.01), 100))
+
+    async def resimulate(pair_address):
+        return (pair_address, '0x' + '2' * 40, 0.02)
+
+    # Свежий результат снова в очереди и исполняется в том же блоке
+    executed, sent = run_block(scheduler, 102, resimulate)
+    assert executed == 1 and sent[0][2] == 0.02
+
+class AdvancingChain:
+    """Каждый запрос головы — новый блок"""
+
+    def __init__(self, start: int):
+        self.number = start
+
+    async def get_latest_block(self):
+        self.number += 1
+        return {'number': self.number, 'hash': f'0x{self.number:x}', 'parentHash': f'0x{self.number - 1:x}'}
+
+def test_discovery_stamps_candidates_with_block_of_check(monkeypatch):
+    monkeypatch.setattr(blocks, 'evm', AdvancingChain(100))
+    monkeypatch.setattr(amm_skim, 'chain', blocks.ChainTracker(depth=12))
+    monkeypatch.setattr(settings.get(), 'MAX_PAIRS', 3)
+    monkeypatch.setattr(settings.get(), 'BLOCK_TIME_SECONDS', 0.0)
+
+    monkeypatch.setattr(amm_skim, 'PAIR_CHECK_DELAY_SECONDS', 0)
+
+    strat = AmmSkim()
+
+    async def always_surplus(pair_address):
+        return (pair_address, '0x' + '2' * 40, 0.01)
+
+    monkeypatch.setattr(strat, '_check_pair_for_surplus', always_surplus)
+
+    candidates = asyncio.run(strat.discover_candidates())
+    assert [strat.candidate_blocks[c[0]] for c in candidates] == [101, 102, 103]
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Бюджет на импорт src.main (холодный старт CLI и воркеров)
+IMPORT_BUDGET_SECONDS = 0.5
+
+CHECK_SCRIPT = """
+import sys
+import src.main
+from src.config import settings
+from src.evm import evm
+assert 'web3' not in sys.modules, 'web3 imported at startup'
+assert 'eth_account' not in sys.modules, 'eth_account imported at startup'
+assert settings._settings is None, 'Settings built at import'
+assert evm._connection is None, 'EVMConnection built at import'
+"""
+
+def test_import_src_main_is_lazy_and_within_budget():
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHECK_SCRIPT],
+        cwd=PROJECT_DIR, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    # Строки -X importtime: "import time: self [us] | cumulative | name"
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == 'src.main':
+            cumulative_us = int(parts[1])
+
+    assert cumulative_us is not None, 'src.main missing from importtime output'
+    assert cumulative_us / 1e6 < IMPORT_BUDGET_SECONDS
+
+APP_CHECK_SCRIPT = """
+import sys
+import app
+assert 'src.main' not in sys.modules, 'src.main imported by app'
+assert 'web3' not in sys.modules, 'web3 imported by app'
+assert 'eth_account' not in sys.modules, 'eth_account imported by app'
+"""
+
+def test_import_app_does_not_pull_in_harvester():
+    pytest.importorskip('flask')
+    result = subprocess.run(
+        [sys.executable, '-c', APP_CHECK_SCRIPT],
+        cwd=PROJECT_DIR, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]